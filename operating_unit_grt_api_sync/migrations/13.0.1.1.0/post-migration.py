@@ -0,0 +1,10 @@
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Move comma separated GRT code prefixes of companies to their own records."""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    companies = env["res.company"].search([("grt_code_prefixes", "!=", False)])
+    companies._create_grt_prefixes_from_code_prefixes()
@@ -1,2 +1,4 @@
 from . import res_company
+from . import res_company_grt_prefix
+from . import res_country
 from . import operating_unit
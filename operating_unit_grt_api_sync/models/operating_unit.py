@@ -1,13 +1,51 @@
 import logging
 import os
-from datetime import datetime
+import threading
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from odoo import fields, models
+from odoo import fields, models, tools
 
 _logger = logging.getLogger(__name__)
 
+# Operating unit values compared with data received from GRT API
+GRT_UPDATE_KEYS = ("name", "valid_from", "valid_until")
+
+# Sessions are kept per thread, so connections to GRT API are reused between syncs
+_grt_api_sessions = threading.local()
+
+
+def _get_grt_api_session():
+    """
+    Returns GRT API session of the current thread. The session doesn't keep any
+    cookies, so nothing is carried over between databases using the same thread.
+    """
+    session = getattr(_grt_api_sessions, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _grt_api_sessions.session = session
+    return session
+
+
+@lru_cache(maxsize=4096)
+def _format_operating_unit_name(code, operating_unit, is_office, branch):
+    """Formats operating unit name, memoized as syncs mostly receive same data."""
+    ou_name = f"{code} - OU {operating_unit}"
+    if is_office:
+        branch_name = f", {branch}"
+    else:
+        branch_name = f", Branch {branch}"
+    return ou_name + branch_name
+
 
 class OperatingUnit(models.Model):
     _inherit = "operating.unit"
@@ -40,14 +78,17 @@ class OperatingUnit(models.Model):
             return
         try:
             _logger.info("GRT API Sync: Requesting data from GRT API.")
-            r = requests.get(
+            r = _get_grt_api_session().get(
                 api_url, headers={"Authorization": f"Bearer {api_key}"}, timeout=30
             )
             if r.status_code == 200:
                 _logger.info("GRT API Sync: Successfully received data from GRT API.")
                 return r.json()
             else:
-                error_message = r.json().get("detail")
+                try:
+                    error_message = r.json().get("detail")
+                except ValueError:
+                    error_message = r.text[:200]
                 _logger.warning(
                     f"GRT API Sync: Request to GRT API failed with "
                     f"status code {r.status_code}: {error_message}."
@@ -83,16 +124,23 @@ class OperatingUnit(models.Model):
             "country_id": data["country_id"],
         }
 
-    def _get_create_vals_operating_unit(self, code, new_data):
+    def _get_create_vals_operating_units(self, new_data):
         """
-        Creates new partner for operating unit and creates related partner based on data received from
+        Creates partners for new operating units in a single batch and returns list
+        of values used to create the operating units, based on data received from
         GRT API.
         """
-        create_vals = self._get_ou_create_vals(code, new_data)
-        partner_create_vals = self._get_ou_partner_create_vals(new_data)
-        partner = self.env["res.partner"].create(partner_create_vals)
-        create_vals["partner_id"] = partner.id
-        return create_vals
+        create_vals_list = []
+        partner_create_vals_list = []
+        for code, branch_data in new_data.items():
+            create_vals_list.append(self._get_ou_create_vals(code, branch_data))
+            partner_create_vals_list.append(
+                self._get_ou_partner_create_vals(branch_data)
+            )
+        partners = self.env["res.partner"].create(partner_create_vals_list)
+        for create_vals, partner in zip(create_vals_list, partners):
+            create_vals["partner_id"] = partner.id
+        return create_vals_list
 
     def _get_update_vals_operating_unit(self, new_data, existing_data):
         """
@@ -100,52 +148,47 @@ class OperatingUnit(models.Model):
         Compares new data with existing data.
         Returns: Dict of values to update on operating unit.
         """
-        vals = {}
-        if new_data.get("name") != existing_data.get("name"):
-            vals["name"] = new_data["name"]
-        if new_data.get("valid_from") != existing_data.get("valid_from"):
-            vals["valid_from"] = new_data["valid_from"]
-        if new_data.get("valid_until") != existing_data.get("valid_until"):
-            vals["valid_until"] = new_data["valid_until"]
+        vals = {
+            key: new_data[key]
+            for key in GRT_UPDATE_KEYS
+            if new_data.get(key) != existing_data.get(key)
+        }
         if not existing_data.get("synced_with_grt"):
             vals["synced_with_grt"] = True
         return vals
 
-    def _is_code_company(self, branch_data, ou_code_company_mapping):
-        return branch_data.get("management_id", "")[:3] in ou_code_company_mapping
-
-    def _is_branch_level(self, branch_data):
-        """Check if branch is on the level 5 (branch)."""
-        return branch_data.get("management_id_level_number", 0) == 5
-
     def _get_grt_api_branches(self, data):
         """
         Filters data received from GRT API to keep only branches (Level 5) data and
         checks if the required keys are present. If so, returns a dictionary with GRT
         code prefixes as keys and dictionaries with data as values.
         """
-        ou_code_company_mapping = self._get_ou_code_company_mapping()
-        countries = self.env["res.country"].search([])
-        country_mapping = {country.name: country.id for country in countries}
+        # Lookups are bound to locals as they run for every row of the payload
+        get_company_id = self._get_ou_code_company_mapping().get
+        get_country_id = self._get_country_name_id_mapping().get
+        to_date = fields.Date.to_date
 
         branches_data = {}
         for branch_data in data:
-            if not self._is_branch_level(branch_data):
+            # Keep only branches (Level 5)
+            if branch_data.get("management_id_level_number") != 5:
                 continue
-            if not self._is_code_company(branch_data, ou_code_company_mapping):
+            # The company is resolved from the code prefix once and reused in values
+            company_id = get_company_id(branch_data.get("management_id", "")[:3])
+            if not company_id:
                 continue
             try:
                 ou_code = branch_data["management_id"]
                 name = self._get_operating_unit_name(ou_code, branch_data)
-                country_name = branch_data.get("l10_operating_country", "")
                 branches_data[ou_code] = {
                     "name": name,
-                    "valid_from": branch_data.get("operational_from", False),
-                    "valid_until": branch_data.get("operational_until", False),
+                    "valid_from": to_date(branch_data.get("operational_from")),
+                    "valid_until": to_date(branch_data.get("operational_until")),
                     "branch": branch_data.get("l5_branch", ""),
-                    "country": country_name,
-                    "country_id": country_mapping.get(country_name, False),
-                    "company_id": ou_code_company_mapping.get(ou_code[:3], False),
+                    "country_id": get_country_id(
+                        branch_data.get("l10_operating_country", ""), False
+                    ),
+                    "company_id": company_id,
                 }
             except KeyError as e:
                 _logger.error(
@@ -159,48 +202,61 @@ class OperatingUnit(models.Model):
         Get operating unit name. If it's not a office add Branch prefix to the branch name.
         Concat OU name with branch name.
         """
-        ou_name = f"{code} - OU {branch_data.get('l8_operating_unit', '')}"
-        if branch_data.get("is_office"):
-            branch_name = f", {branch_data.get('l5_branch', '')}"
-        else:
-            branch_name = f", Branch {branch_data.get('l5_branch', '')}"
-        return ou_name + branch_name
+        return _format_operating_unit_name(
+            code,
+            branch_data.get("l8_operating_unit", ""),
+            bool(branch_data.get("is_office")),
+            branch_data.get("l5_branch", ""),
+        )
 
+    @tools.ormcache("self.env.lang")
+    def _get_country_name_id_mapping(self):
+        """
+        Returns dictionary with country names as keys and country IDs as values.
+        The result is cached, it is invalidated when countries are changed.
+        """
+        countries = self.env["res.country"].sudo().search_read([], ["name"])
+        return {country["name"]: country["id"] for country in countries}
+
+    @tools.ormcache()
     def _get_ou_code_company_mapping(self):
         """
         Returns dictionary with GRT code prefixes as keys and matching company IDs
-        as values.
+        as values. The result is cached, it is invalidated when GRT code prefixes
+        are changed.
         """
-        ou_code_company_mapping = {}
-        compatible_companies = self.env["res.company"].search(
-            [("grt_code_prefixes", "!=", False)]
-        )
-        for company in compatible_companies:
-            prefixes = company.grt_code_prefixes.replace(" ", "").split(",")
-            ou_code_company_mapping.update(
-                {prefix.strip(): company.id for prefix in prefixes}
-            )
-        return ou_code_company_mapping
+        prefixes = self.env["res.company.grt.prefix"].sudo().search([])
+        return {prefix.prefix: prefix.company_id.id for prefix in prefixes}
 
-    def _get_existing_operating_unit_data(self):
-        operating_units = self.search([])
+    def _get_existing_operating_unit_data(self, codes):
+        """
+        Returns dictionary with codes as keys and existing operating units data as
+        values. Only operating units with given codes are read.
+        """
+        operating_units = self.search([("code", "in", list(codes))])
+        ou_rows = operating_units.read(
+            ["code", "name", "valid_from", "valid_until", "synced_with_grt"],
+            load=False,
+        )
         operating_units_data = {
-            ou.code: {
-                "object": ou,
-                "name": ou.name,
-                "valid_from": datetime.strftime(ou.valid_from, "%Y-%m-%d")
-                if ou.valid_from
-                else None,
-                "valid_until": datetime.strftime(ou.valid_until, "%Y-%m-%d")
-                if ou.valid_until
-                else None,
-                "country": ou.partner_id.country_id.name,
-                "synced_with_grt": ou.synced_with_grt,
+            row["code"]: {
+                "object": self.browse(row["id"]),
+                "name": row["name"],
+                "valid_from": row["valid_from"] or None,
+                "valid_until": row["valid_until"] or None,
+                "synced_with_grt": row["synced_with_grt"],
             }
-            for ou in operating_units
+            for row in ou_rows
         }
         return operating_units_data
 
+    def _get_grt_log_vals(self, vals):
+        """Returns copy of values with dates formatted as strings, used in logs."""
+        return {
+            key: fields.Date.to_string(value) if isinstance(value, date) else value
+            for key, value in vals.items()
+        }
+
     def _process_grt_operating_unit_data(self, data):
         """
         Processes data received from GRT API by comparing identically structured data
@@ -208,8 +264,12 @@ class OperatingUnit(models.Model):
         update the OU if necessary. Otherwise create a new OU.
         """
         if branches_data := self._get_grt_api_branches(data):
-            create_vals_list = []
-            existing_operating_units_data = self._get_existing_operating_unit_data()
+            new_data = {}
+            logs = []
+            updates_by_vals = defaultdict(list)
+            existing_operating_units_data = self._get_existing_operating_unit_data(
+                branches_data.keys()
+            )
             for code, branch_data in branches_data.items():
                 existing_operating_unit_data = existing_operating_units_data.get(code)
                 if existing_operating_unit_data:
@@ -217,45 +277,62 @@ class OperatingUnit(models.Model):
                         branch_data, existing_operating_unit_data
                     )
                     if vals:
-                        existing_operating_unit_data.get("object").write(vals)
-                        self._log_grt_api_changes(
-                            f"Updated operating unit for code = {code} with values: {vals}",
-                            "update",
+                        operating_unit = existing_operating_unit_data.get("object")
+                        updates_by_vals[frozenset(vals.items())].append(
+                            operating_unit.id
+                        )
+                        log_vals = self._get_grt_log_vals(vals)
+                        logs.append(
+                            (
+                                f"Updated operating unit for code = {code} with values: {log_vals}",
+                                "update",
+                            )
                         )
                 else:
-                    vals = self._get_create_vals_operating_unit(code, branch_data)
-                    create_vals_list.append(vals)
-            if create_vals_list:
+                    new_data[code] = branch_data
+            # Operating units sharing the same changes are updated together
+            for vals, ids in updates_by_vals.items():
+                self.browse(ids).write(dict(vals))
+            if new_data:
+                create_vals_list = self._get_create_vals_operating_units(new_data)
                 self.create(create_vals_list)
-                self._log_grt_api_changes(
-                    f"Created new operating units with values: {create_vals_list}",
-                    "create",
+                log_vals_list = [
+                    self._get_grt_log_vals(vals) for vals in create_vals_list
+                ]
+                logs.append(
+                    (
+                        f"Created new operating units with values: {log_vals_list}",
+                        "create",
+                    )
                 )
                 _logger.info(
                     f"GRT API Sync: Successfully created [{len(create_vals_list)}] Operating Units."
                 )
+            if logs:
+                self._log_grt_api_changes(logs)
 
-    def _log_grt_api_changes(self, message, action_type):
-        """Log api changes to ir.logging table."""
-
-        def log(message, action_type):
-            with self.pool.cursor() as cr:
-                cr.execute(
-                    """
-                    INSERT INTO ir_logging(create_date, create_uid, type, dbname, name, level, message, path, line, func)
-                    VALUES (NOW() at time zone 'UTC', %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                    (
-                        self.env.uid,
-                        "server",
-                        self._cr.dbname,
-                        __name__,
-                        "info",
-                        message,
-                        "sync",
-                        action_type,
-                        "Sync with GRT API",
-                    ),
-                )
-
-        log(message, action_type)
+    def _log_grt_api_changes(self, logs):
+        """
+        Log api changes to ir.logging table. Expects list of (message, action type)
+        tuples, all of them are inserted using a single query.
+        """
+        messages, action_types = zip(*logs)
+        with self.pool.cursor() as cr:
+            cr.execute(
+                """
+                INSERT INTO ir_logging(create_date, create_uid, type, dbname, name, level, message, path, line, func)
+                SELECT NOW() at time zone 'UTC', %s, %s, %s, %s, %s, log.message, %s, log.action_type, %s
+                FROM unnest(%s::text[], %s::text[]) AS log(message, action_type)
+            """,
+                (
+                    self.env.uid,
+                    "server",
+                    self._cr.dbname,
+                    __name__,
+                    "info",
+                    "sync",
+                    "Sync with GRT API",
+                    list(messages),
+                    list(action_types),
+                ),
+            )
@@ -1,32 +1,122 @@
+import logging
+
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+
+def _split_grt_code_prefixes(grt_code_prefixes):
+    """
+    Returns list of GRT code prefixes parsed from comma separated string, keeps
+    their order and skips empty and duplicated ones. All whitespace is removed,
+    including tabs, newlines and non-breaking spaces.
+    """
+    prefixes = "".join((grt_code_prefixes or "").split()).split(",")
+    return list(dict.fromkeys(filter(None, prefixes)))
+
 
 class ResCompany(models.Model):
     _inherit = "res.company"
 
+    grt_prefix_ids = fields.One2many(
+        "res.company.grt.prefix", "company_id", string="GRT Prefixes"
+    )
     grt_code_prefixes = fields.Char(
         string="GRT Code Prefixes",
         help="Enter GRT code prefixes related to this company, separated by comma.",
+        compute="_compute_grt_code_prefixes",
+        inverse="_inverse_grt_code_prefixes",
+        store=True,
     )
 
-    @api.constrains("grt_code_prefixes")
-    def _check_code_prefix_unique(self):
-        """Check if grt code prefix is unique across companies."""
-        ou_code_company_mapping = self.env[
-            "operating.unit"
-        ]._get_ou_code_company_mapping()
-        for rec in self:
-            prefixes = (
-                rec.grt_code_prefixes.replace(" ", "").split(",")
-                if rec.grt_code_prefixes
-                else []
+    @api.depends("grt_prefix_ids.prefix")
+    def _compute_grt_code_prefixes(self):
+        for company in self:
+            company.grt_code_prefixes = (
+                ", ".join(company.grt_prefix_ids.mapped("prefix")) or False
+            )
+
+    def _inverse_grt_code_prefixes(self):
+        """
+        Syncs GRT prefix records with comma separated GRT code prefixes. Prefixes
+        used by other companies are reported, uniqueness of the prefixes is also
+        enforced by the database.
+        """
+        prefixes_to_unlink = self.env["res.company.grt.prefix"]
+        prefix_vals_list = []
+        for company in self:
+            prefixes = _split_grt_code_prefixes(company.grt_code_prefixes)
+            prefixes_to_unlink |= company.grt_prefix_ids.filtered(
+                lambda p: p.prefix not in prefixes
+            )
+            existing_prefixes = set(company.grt_prefix_ids.mapped("prefix"))
+            prefix_vals_list += [
+                {"company_id": company.id, "prefix": prefix}
+                for prefix in prefixes
+                if prefix not in existing_prefixes
+            ]
+        # Prefixes added to several companies within the same write
+        prefix_company_mapping = {}
+        for vals in prefix_vals_list:
+            company_id = prefix_company_mapping.setdefault(
+                vals["prefix"], vals["company_id"]
+            )
+            if company_id != vals["company_id"]:
+                raise ValidationError(
+                    _("GRT code prefix = [%s] already exists in company ID = [%s]")
+                    % (vals["prefix"], company_id)
+                )
+        # Prefixes kept by any company, including the ones being written
+        conflicting_prefix = self.env["res.company.grt.prefix"].search(
+            [
+                ("prefix", "in", list(prefix_company_mapping)),
+                ("id", "not in", prefixes_to_unlink.ids),
+            ],
+            limit=1,
+        )
+        if conflicting_prefix:
+            raise ValidationError(
+                _("GRT code prefix = [%s] already exists in company ID = [%s]")
+                % (conflicting_prefix.prefix, conflicting_prefix.company_id.id)
             )
-            for prefix in prefixes:
-                company_id = ou_code_company_mapping.get(prefix)
-                if company_id and company_id != rec.id:
-                    raise ValidationError(
-                        _(
-                            f"GRT code prefix = [{prefix}] already exists in company ID = [{company_id}]"
-                        )
+        # Prefixes are removed first, so they can be moved between companies
+        prefixes_to_unlink.unlink()
+        self.env["res.company.grt.prefix"].create(prefix_vals_list)
+
+    def _create_grt_prefixes_from_code_prefixes(self):
+        """
+        Creates GRT prefix records from stored GRT code prefixes, used when migrating
+        from comma separated prefixes. Prefixes already used by another company are
+        skipped and logged, so clashes in existing data don't block the migration.
+        """
+        prefix_company_mapping = {
+            prefix.prefix: prefix.company_id.id
+            for prefix in self.env["res.company.grt.prefix"].search([])
+        }
+        prefix_vals_list = []
+        for company in self.sorted("id"):
+            for prefix in _split_grt_code_prefixes(company.grt_code_prefixes):
+                company_id = prefix_company_mapping.setdefault(prefix, company.id)
+                if company_id != company.id:
+                    _logger.warning(
+                        "GRT code prefix [%s] of company ID = [%s] is skipped, "
+                        "it already exists in company ID = [%s].",
+                        prefix,
+                        company.id,
+                        company_id,
+                    )
+                elif prefix not in company.grt_prefix_ids.mapped("prefix"):
+                    prefix_vals_list.append(
+                        {"company_id": company.id, "prefix": prefix}
                     )
+        self.env["res.company.grt.prefix"].create(prefix_vals_list)
+        # Skipped prefixes are dropped from the stored comma separated prefixes
+        self.modified(["grt_prefix_ids"])
+        self.recompute()
+
+    def unlink(self):
+        # GRT prefix records are removed by the database cascade
+        if self.mapped("grt_prefix_ids"):
+            self.clear_caches()
+        return super(ResCompany, self).unlink()
@@ -0,0 +1,34 @@
+from odoo import api, fields, models
+
+
+class ResCompanyGrtPrefix(models.Model):
+    _name = "res.company.grt.prefix"
+    _description = "Company GRT Code Prefix"
+    _order = "company_id, id"
+    _rec_name = "prefix"
+
+    company_id = fields.Many2one(
+        "res.company", required=True, index=True, ondelete="cascade"
+    )
+    prefix = fields.Char(required=True)
+
+    _sql_constraints = [
+        (
+            "prefix_uniq",
+            "unique (prefix)",
+            "The GRT code prefix must be unique across companies!",
+        ),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.clear_caches()
+        return super(ResCompanyGrtPrefix, self).create(vals_list)
+
+    def write(self, vals):
+        self.clear_caches()
+        return super(ResCompanyGrtPrefix, self).write(vals)
+
+    def unlink(self):
+        self.clear_caches()
+        return super(ResCompanyGrtPrefix, self).unlink()
@@ -0,0 +1,19 @@
+from odoo import api, models
+
+
+class ResCountry(models.Model):
+    _inherit = "res.country"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.clear_caches()
+        return super(ResCountry, self).create(vals_list)
+
+    def write(self, vals):
+        if "name" in vals:
+            self.clear_caches()
+        return super(ResCountry, self).write(vals)
+
+    def unlink(self):
+        self.clear_caches()
+        return super(ResCountry, self).unlink()
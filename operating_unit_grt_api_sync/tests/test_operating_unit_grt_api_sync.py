@@ -1,5 +1,10 @@
+import importlib.util
+import os
 from datetime import datetime
 
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.modules.module import get_module_path
 from odoo.tests import common
 
 
@@ -376,3 +381,183 @@ should not have been created.",
             False,
             "OU should be flagged as not synced with the API.",
         )
+
+    def test_04_grt_code_prefix_unique(self):
+        """Test that GRT code prefixes are stored per company and are unique."""
+        company = self.env["res.company"].create(
+            {"name": "GRT Test Company", "grt_code_prefixes": "TST, XYZ"}
+        )
+        self.assertEqual(
+            company.grt_prefix_ids.mapped("prefix"),
+            ["TST", "XYZ"],
+            "A GRT prefix record should have been created for each prefix.",
+        )
+        self.assertEqual(
+            self.OperatingUnit._get_ou_code_company_mapping().get("XYZ"),
+            company.id,
+            "GRT prefix should be mapped to the company.",
+        )
+        with self.assertRaises(ValidationError), self.cr.savepoint():
+            company.write({"grt_code_prefixes": "TST, DEM"})
+        company_2 = self.env["res.company"].create({"name": "GRT Test Company 2"})
+        with self.assertRaises(ValidationError), self.cr.savepoint():
+            (company | company_2).write({"grt_code_prefixes": "DUP"})
+        with self.assertRaises(ValidationError), self.cr.savepoint():
+            company_2.write({"grt_code_prefixes": "TST"})
+        company.write({"grt_code_prefixes": "TST"})
+        self.assertEqual(
+            company.grt_prefix_ids.mapped("prefix"),
+            ["TST"],
+            "Removed GRT prefix records should have been deleted.",
+        )
+        self.assertFalse(
+            self.OperatingUnit._get_ou_code_company_mapping().get("XYZ"),
+            "Removed GRT prefix should not be mapped to the company anymore.",
+        )
+
+    def test_05_move_grt_code_prefix(self):
+        """Test that GRT code prefix can be moved to another company."""
+        company_1 = self.env["res.company"].create(
+            {"name": "GRT Test Company 1", "grt_code_prefixes": "MV1, MV2"}
+        )
+        company_2 = self.env["res.company"].create({"name": "GRT Test Company 2"})
+        company_1.write({"grt_code_prefixes": "MV1"})
+        company_2.write({"grt_code_prefixes": "MV2"})
+        self.assertEqual(
+            company_2.grt_prefix_ids.mapped("prefix"),
+            ["MV2"],
+            "GRT prefix should have been moved to company 2.",
+        )
+        self.assertEqual(
+            self.OperatingUnit._get_ou_code_company_mapping().get("MV2"),
+            company_2.id,
+            "Moved GRT prefix should be mapped to company 2.",
+        )
+
+    def test_06_migrate_grt_code_prefixes(self):
+        """
+        Test that the migration creates GRT prefix records from stored comma
+        separated prefixes and skips prefixes already used by another company.
+        """
+        company_1 = self.env["res.company"].create({"name": "GRT Test Company 1"})
+        company_2 = self.env["res.company"].create({"name": "GRT Test Company 2"})
+        # Prefixes stored before GRT prefix records existed
+        self.env.cr.execute(
+            "UPDATE res_company SET grt_code_prefixes = %s WHERE id = %s",
+            ("MG1, MG2", company_1.id),
+        )
+        self.env.cr.execute(
+            "UPDATE res_company SET grt_code_prefixes = %s WHERE id = %s",
+            ("MG2,MG3", company_2.id),
+        )
+        self.env["res.company"].invalidate_cache()
+
+        spec = importlib.util.spec_from_file_location(
+            "post_migration",
+            os.path.join(
+                get_module_path("operating_unit_grt_api_sync"),
+                "migrations",
+                "13.0.1.1.0",
+                "post-migration.py",
+            ),
+        )
+        post_migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(post_migration)
+        post_migration.migrate(self.env.cr, "13.0.1.0.0")
+
+        self.assertEqual(
+            company_1.grt_prefix_ids.mapped("prefix"),
+            ["MG1", "MG2"],
+            "GRT prefix records should have been created for company 1.",
+        )
+        self.assertEqual(
+            company_2.grt_prefix_ids.mapped("prefix"),
+            ["MG3"],
+            "GRT prefix already used by company 1 should have been skipped.",
+        )
+        self.assertEqual(
+            company_2.grt_code_prefixes,
+            "MG3",
+            "Skipped GRT prefix should have been removed from company 2 prefixes.",
+        )
+        self.assertEqual(
+            self.env.ref("base.main_company").grt_prefix_ids.mapped("prefix"),
+            ["DEM"],
+            "Already migrated GRT prefixes should have been kept.",
+        )
+
+    def test_07_grt_code_prefixes_whitespace(self):
+        """Test that whitespace around GRT code prefixes is ignored."""
+        company = self.env["res.company"].create(
+            {
+                "name": "GRT Test Company",
+                "grt_code_prefixes": "WS1,\tWS2,\nWS3,\xa0WS4 ",
+            }
+        )
+        ou_code_company_mapping = self.OperatingUnit._get_ou_code_company_mapping()
+        for prefix in ("WS1", "WS2", "WS3", "WS4"):
+            self.assertEqual(
+                ou_code_company_mapping.get(prefix),
+                company.id,
+                f"GRT prefix {prefix} should be mapped to the company.",
+            )
+
+    def test_08_update_operating_units_with_same_changes(self):
+        """
+        Test that operating units with identical changes are updated and that
+        the changes are logged.
+        """
+        # Logs are written with a separate cursor, share the test transaction
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        last_log_id = self.env["ir.logging"].search([], order="id desc", limit=1).id
+        date_from = self.mid_to_update_1_data["operational_from"]
+        date_until = self.mid_to_update_1_data["operational_until"]
+        api_data = []
+        operating_units = self.OperatingUnit
+        for code in ("DEM1205", "DEM1206"):
+            branch_data = dict(
+                self.mid_to_update_1_data,
+                management_id=code,
+                l5_branch_management_id=code,
+            )
+            api_data.append(branch_data)
+            operating_units |= self.OperatingUnit.create(
+                {
+                    "name": self.OperatingUnit._get_operating_unit_name(
+                        code, branch_data
+                    ),
+                    "code": code,
+                    "partner_id": self.env.ref("base.main_partner").id,
+                    "valid_from": self.ou_to_update_valid_from,
+                    "valid_until": self.ou_to_update_valid_until,
+                    "synced_with_grt": True,
+                }
+            )
+        self.OperatingUnit._process_grt_operating_unit_data(api_data)
+
+        for operating_unit in operating_units:
+            self.assertEqual(
+                fields.Date.to_string(operating_unit.valid_from),
+                date_from,
+                "Valid from date should have been updated.",
+            )
+            self.assertEqual(
+                fields.Date.to_string(operating_unit.valid_until),
+                date_until,
+                "Valid until date should have been updated.",
+            )
+        logs = self.env["ir.logging"].search(
+            [
+                ("id", ">", last_log_id),
+                ("func", "=", "Sync with GRT API"),
+                ("line", "=", "update"),
+            ]
+        )
+        self.assertEqual(len(logs), 2, "Each update should have been logged.")
+        for operating_unit in operating_units:
+            log = logs.filtered(lambda log: operating_unit.code in log.message)
+            self.assertTrue(log, "Update of the operating unit should be logged.")
+            self.assertIn(
+                date_from, log.message, "Logged dates should be formatted as strings."
+            )
@@ -18,16 +18,33 @@ class CrmTeam(models.Model):
 
     @api.constrains("operating_unit_id", "company_id")
     def _check_company_operating_unit(self):
-        for team in self:
-            if (
-                team.company_id
-                and team.operating_unit_id
-                and team.company_id != team.operating_unit_id.company_id
-            ):
-                raise UserError(
-                    _(
-                        "Configuration error, "
-                        "The Company in the Sales Team and in the "
-                        "Management ID must be the same."
-                    )
+        teams_data = [
+            data
+            for data in self.read(["company_id", "operating_unit_id"], load=False)
+            if data["company_id"] and data["operating_unit_id"]
+        ]
+        operating_units = self.env["operating.unit"].browse(
+            {data["operating_unit_id"] for data in teams_data}
+        )
+        ou_company_mapping = {
+            data["id"]: data["company_id"]
+            for data in operating_units.read(["company_id"], load=False)
+        }
+        teams = self.browse(
+            [
+                data["id"]
+                for data in teams_data
+                if ou_company_mapping.get(data["operating_unit_id"])
+                != data["company_id"]
+            ]
+        )
+        if teams:
+            raise UserError(
+                _(
+                    "Configuration error, "
+                    "The Company in the Sales Team and in the "
+                    "Management ID must be the same."
                 )
+                + "\n"
+                + _("Sales Teams: %s") % ", ".join(teams.mapped("name"))
+            )
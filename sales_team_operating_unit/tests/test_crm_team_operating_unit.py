@@ -2,6 +2,7 @@
 # Copyright 2017-TODAY Serpent Consulting Services Pvt. Ltd.
 #   (<http://www.serpentcs.com>)
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from odoo.exceptions import UserError
 from odoo.tests import common
 
 
@@ -71,3 +72,23 @@ class TestSaleTeamOperatingUnit(common.TransactionCase):
         self.assertEqual(
             team.ids, [], "User 2 should not have access to " "%s" % self.ou1.name
         )
+
+    def test_crm_team_company_operating_unit(self):
+        # Operating unit of another company can't be set on the teams
+        company2 = self.env["res.company"].create({"name": "Test Company 2"})
+        ou_company2 = self.env["operating.unit"].create(
+            {
+                "name": "Test Company 2 OU",
+                "code": "TC2OU",
+                "partner_id": company2.partner_id.id,
+                "company_id": company2.id,
+            }
+        )
+        self.team1.name = "CRM team 1"
+        self.team2.name = "CRM team 2"
+        with self.assertRaises(UserError) as error, self.cr.savepoint():
+            (self.team1 | self.team2).write({"operating_unit_id": ou_company2.id})
+        error_message = error.exception.args[0]
+        self.assertIn("must be the same", error_message)
+        self.assertIn("CRM team 1", error_message)
+        self.assertIn("CRM team 2", error_message)